@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
+import functools
 import os
 import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import List, Optional, Set, Tuple
 
 # --- Configuration ---
 CWD = Path.cwd()
@@ -11,6 +13,7 @@ SRC_DIR = CWD / "src"
 MODULE_ROOT = SRC_DIR / "modules/ROOT"
 PAGES_DIR = MODULE_ROOT / "pages"
 PARTIALS_DIR = MODULE_ROOT / "partials"
+PARTIALS_PREFIX = str(PARTIALS_DIR) + os.sep
 DEST_NAV_FILE = MODULE_ROOT / "nav.adoc"
 
 MASTER_FILES = [
@@ -23,8 +26,12 @@ MASTER_FILES = [
 MAX_NAV_DEPTH = 4
 # Only include chapter-level headings (===) in the nav for page internals.
 ALLOWED_SECTION_LEVELS = {3}
+# A file without this substring cannot contain an allowed section heading.
+_SECTION_MARKER = "=" * min(ALLOWED_SECTION_LEVELS)
 
 IGNORE_TITLES = {"description", "options", "example", "examples", "notes", "see also"}
+# Titles of any other length cannot be ignored, so lower() can be skipped for them.
+_IGNORE_LENS = frozenset(map(len, IGNORE_TITLES))
 
 # Aliasing for shared content. Support both "basename" master keys and "relative path" keys.
 ALIAS_MAP = {
@@ -40,14 +47,48 @@ ALIAS_MAP = {
     },
 }
 
+# ALIAS_MAP flattened to (master_key, xref_path) -> alias_path for single-lookup resolution
+_ALIAS_FLAT = {
+    (master_key, xref_path): alias_path
+    for master_key, rules in ALIAS_MAP.items()
+    for xref_path, alias_path in rules.items()
+}
+
+# Section headings of a page as parallel columns: (levels, anchors, titles)
+Sections = Tuple[Tuple[int, ...], Tuple[str, ...], Tuple[str, ...]]
+
+# Precompiled patterns
+_INCLUDE_RE = re.compile(r'include::([^[\]]+)\[\]')
+_AGG_RE = re.compile(r"^===\s+")
+_ANCHOR_STRIP = re.compile(r"[^\w\s-]")
+_ANCHOR_WS = re.compile(r"\s+")
+_ANCHOR_DASH = re.compile(r"-{2,}")
+
+# ASCII equivalent of _ANCHOR_STRIP + _ANCHOR_WS for str.translate:
+# whitespace maps to '-', anything not a word char or '-' is dropped.
+_ANCHOR_TABLE = {
+    c: ("-" if chr(c).isspace() else None)
+    for c in range(128)
+    if chr(c).isspace() or not (chr(c).isalnum() or chr(c) in "_-")
+}
+
 # -------------- Utilities --------------
 
-def read_text_lines(p: Path) -> List[str]:
+# Parsing helpers below are pure in their Path argument and are memoized,
+# since the same page is scanned by several helpers during nav generation.
+
+@functools.lru_cache(maxsize=None)
+def read_text(p: Path) -> str:
     try:
-        return p.read_text(encoding="utf-8").splitlines()
+        # read_bytes() skips the TextIOWrapper layer; we always want the whole file.
+        return p.read_bytes().decode("utf-8", errors="replace")
     except Exception as e:
         print(f"Warning: Could not read {p}: {e}")
-        return []
+        return ""
+
+@functools.lru_cache(maxsize=None)
+def read_text_lines(p: Path) -> Tuple[str, ...]:
+    return tuple(read_text(p).splitlines())
 
 def debug_head(p: Path, max_lines: int = 12):
     lines = read_text_lines(p)
@@ -59,30 +100,49 @@ def debug_head(p: Path, max_lines: int = 12):
 
 def make_anchor_from_title(title: str) -> str:
     s = title.strip().lower()
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"\s+", "-", s)
-    s = re.sub(r"-{2,}", "-", s)
+    if s.isascii():
+        s = s.translate(_ANCHOR_TABLE)
+    else:
+        # \w and \s are Unicode-aware; keep the regex path for non-ASCII titles.
+        s = _ANCHOR_STRIP.sub("", s)
+        s = _ANCHOR_WS.sub("-", s)
+    s = _ANCHOR_DASH.sub("-", s)
     return s.strip("-")
 
-def extract_include_files(file_path: Path) -> List[Path]:
-    """Return resolved include file paths present in a file."""
+def parse_heading(line: str) -> Optional[Tuple[int, str]]:
+    """
+    Returns (level, title) if a stripped line is an AsciiDoc heading ('=' run,
+    whitespace, text), else None. Hand-rolled equivalent of r"^(=+)\s+(.+)$".
+    """
+    n = len(line) - len(line.lstrip("="))
+    if n == 0 or n == len(line) or not line[n].isspace():
+        return None
+    return (n, line[n:].strip())
+
+@functools.lru_cache(maxsize=None)
+def extract_include_files(file_path: Path) -> Tuple[Path, ...]:
+    """Return normalized include file paths present in a file."""
     includes: List[Path] = []
     lines = read_text_lines(file_path)
-    pattern = re.compile(r'include::([^[\]]+)\[\]')
+    base_dir = str(file_path.parent)
     for line in lines:
-        m = pattern.search(line)
+        m = _INCLUDE_RE.search(line)
         if not m:
             continue
         include_rel_path = m.group(1).strip()
-        inc = (file_path.parent / include_rel_path).resolve()
-        if PARTIALS_DIR in inc.parents:
+        # Lexical normalization is enough here (no symlinks in the docs tree) and
+        # avoids the per-include stat chain of Path.resolve().
+        inc_str = os.path.normpath(os.path.join(base_dir, include_rel_path))
+        if inc_str.startswith(PARTIALS_PREFIX):
             continue
+        inc = Path(inc_str)
         if not inc.exists():
             print(f"Warning: Include file not found: {inc}")
             continue
         includes.append(inc)
-    return includes
+    return tuple(includes)
 
+@functools.lru_cache(maxsize=None)
 def get_title_and_anchor(file_path: Path, prefer_doc_title: bool = False) -> Tuple[str, str]:
     """
     Returns (title, anchor).
@@ -96,42 +156,48 @@ def get_title_and_anchor(file_path: Path, prefer_doc_title: bool = False) -> Tup
     anchor: str = ""
     title: Optional[str] = None
 
+    # Dispatch on the first character: only '[[id]]' and '=' heading lines need
+    # further work, everything else (blank, comments, attributes, includes, prose) is skipped.
     i = 0
     while i < len(lines):
         line = lines[i].strip()
-        if (not line or line.startswith("//") or line.startswith(":") or line.startswith("include::")):
-            i += 1
-            continue
+        c0 = line[:1]
 
-        if line.startswith("[[") and line.endswith("]]"):
+        if c0 == "[" and line.startswith("[[") and line.endswith("]]"):
             anchor = line[2:-2].strip()
             i += 1
             # find next heading
             while i < len(lines):
                 peek = lines[i].strip()
-                if (not peek or peek.startswith("//") or peek.startswith(":") or peek.startswith("include::")):
+                p0 = peek[:1]
+                if (not p0 or p0 == ":" or (p0 == "/" and peek.startswith("//"))
+                        or (p0 == "i" and peek.startswith("include::"))):
                     i += 1
                     continue
+                if p0 != "=":
+                    break
                 if prefer_doc_title:
                     if peek.startswith("= ") and not peek.startswith("== "):
                         title = peek.lstrip("= ").strip()
                         return (title, anchor)
-                m = re.match(r"^(=+)\s+(.+)$", peek)
-                if m:
-                    level = len(m.group(1))
+                heading = parse_heading(peek)
+                if heading:
+                    level, title = heading
                     if prefer_doc_title:
                         if level == 1:
-                            title = m.group(2).strip()
                             return (title, anchor)
                         break
                     if level >= 2:
-                        title = m.group(2).strip()
                         if not anchor:
                             anchor = make_anchor_from_title(title)
                         return (title, anchor)
                 break
             continue
 
+        if c0 != "=":
+            i += 1
+            continue
+
         if prefer_doc_title:
             if line.startswith("= ") and not line.startswith("== "):
                 title = line.lstrip("= ").strip()
@@ -139,11 +205,10 @@ def get_title_and_anchor(file_path: Path, prefer_doc_title: bool = False) -> Tup
                     anchor = make_anchor_from_title(title)
                 return (title, anchor)
         else:
-            m = re.match(r"^(=+)\s+(.+)$", line)
-            if m:
-                level = len(m.group(1))
+            heading = parse_heading(line)
+            if heading:
+                level, title = heading
                 if level >= 2:
-                    title = m.group(2).strip()
                     if not anchor:
                         anchor = make_anchor_from_title(title)
                     return (title, anchor)
@@ -152,60 +217,74 @@ def get_title_and_anchor(file_path: Path, prefer_doc_title: bool = False) -> Tup
 
     return ("Untitled", anchor)
 
-def extract_section_headings(file_path: Path) -> List[Tuple[int, str, str]]:
+@functools.lru_cache(maxsize=None)
+def extract_section_headings(file_path: Path) -> Sections:
     """
-    Returns list of (level, anchor, title) for headings within a file.
+    Returns (levels, anchors, titles) columns for headings within a file;
+    iterate with zip() to get per-heading (level, anchor, title).
     Only collects headings where 'level' is in ALLOWED_SECTION_LEVELS.
     Prefer an explicit [[id]] immediately preceding the heading; otherwise, derive an anchor.
     """
+    levels: List[int] = []
+    anchors: List[str] = []
+    titles: List[str] = []
+
+    # Cheap whole-file substring test lets most non-chapter pages skip the line loop.
+    if _SECTION_MARKER not in read_text(file_path):
+        return ((), (), ())
     lines = read_text_lines(file_path)
-    if not lines:
-        return []
 
-    results: List[Tuple[int, str, str]] = []
     i = 0
     last_anchor: Optional[str] = None
 
     while i < len(lines):
         line = lines[i].strip()
-
-        if line.startswith("[[") and line.endswith("]]"):
-            last_anchor = line[2:-2].strip()
+        if not line:
             i += 1
             continue
 
-        if (not line or line.startswith("//") or line.startswith(":") or line.startswith("include::")):
+        # Blank lines, comments, attributes and includes keep a pending [[id]];
+        # any other line consumes it.
+        c0 = line[0]
+        if c0 == "[":
+            if line.startswith("[[") and line.endswith("]]"):
+                last_anchor = line[2:-2].strip()
+                i += 1
+                continue
+        elif c0 == ":" or (c0 == "/" and line.startswith("//")) or (c0 == "i" and line.startswith("include::")):
             i += 1
             continue
-
-        m = re.match(r"^(=+)\s+(.+)$", line)
-        if m:
-            level = len(m.group(1))
-            title = m.group(2).strip()
-            if title and title.lower() not in IGNORE_TITLES and level in ALLOWED_SECTION_LEVELS:
-                anchor = last_anchor or make_anchor_from_title(title)
-                results.append((level, anchor, title))
-            last_anchor = None
-        else:
-            last_anchor = None
-
+        elif c0 == "=":
+            heading = parse_heading(line)
+            if heading:
+                level, title = heading
+                if level in ALLOWED_SECTION_LEVELS:
+                    if title and not (len(title) in _IGNORE_LENS and title.lower() in IGNORE_TITLES):
+                        anchor = last_anchor or make_anchor_from_title(title)
+                        levels.append(level)
+                        anchors.append(anchor)
+                        titles.append(title)
+
+        last_anchor = None
         i += 1
 
-    return results
+    return (tuple(levels), tuple(anchors), tuple(titles))
 
+@functools.lru_cache(maxsize=None)
 def is_aggregator_page(file_path: Path) -> bool:
     """
     Heuristic: a page that has a top heading and then mostly include:: lines.
     We detect at least one include and no in-page (===) headings.
     """
-    includes = extract_include_files(file_path)
-    if not includes:
+    # Resolve includes first so every processed page reports missing includes.
+    if not extract_include_files(file_path):
         return False
 
-    lines = read_text_lines(file_path)
-    for line in lines:
-        if re.match(r"^===\s+", line.strip()):
-            return False
+    if "===" in read_text(file_path):
+        for line in read_text_lines(file_path):
+            s = line.lstrip()
+            if s[:1] == "=" and _AGG_RE.match(s.rstrip()):
+                return False
     return True
 
 def resolve_alias(master_key: str, xref_path_str: str) -> Tuple[str, Optional[str]]:
@@ -213,31 +292,90 @@ def resolve_alias(master_key: str, xref_path_str: str) -> Tuple[str, Optional[st
     Returns (final_xref_path, alias_path_if_created_or_None).
     Looks up alias rules for both the full master path and its basename.
     """
-    basename_key = Path(master_key).name
-    for key in (master_key, basename_key):
-        if key in ALIAS_MAP and xref_path_str in ALIAS_MAP[key]:
-            return (ALIAS_MAP[key][xref_path_str], ALIAS_MAP[key][xref_path_str])
-    return (xref_path_str, None)
+    alias_path = _ALIAS_FLAT.get((master_key, xref_path_str))
+    if alias_path is None:
+        alias_path = _ALIAS_FLAT.get((os.path.basename(master_key), xref_path_str))
+    if alias_path is None:
+        return (xref_path_str, None)
+    return (alias_path, alias_path)
 
 def create_alias_file(alias_page_path_str: str, target_page_path_str: str):
     """Creates an AsciiDoc alias file that includes the target page and sets page-alias."""
     alias_abs_path = PAGES_DIR / alias_page_path_str
-    target_abs_path = PAGES_DIR / target_page_path_str
 
-    alias_abs_path.parent.mkdir(parents=True, exist_ok=True)
-    relative_include_path = os.path.relpath(target_abs_path, alias_abs_path.parent)
+    # Both pages live under PAGES_DIR, so the include path is just "../" for each
+    # alias directory not shared with the target, followed by the rest of the target.
+    alias_dirs = alias_page_path_str.split("/")[:-1]
+    target_parts = target_page_path_str.split("/")
+    common = 0
+    while (common < len(alias_dirs) and common < len(target_parts) - 1
+           and alias_dirs[common] == target_parts[common]):
+        common += 1
+    relative_include_path = "../" * (len(alias_dirs) - common) + "/".join(target_parts[common:])
 
     content = (
         f":page-alias: {target_page_path_str}\n"
         f"include::{relative_include_path}[]\n"
     )
+
+    # Leave an up-to-date alias file untouched (common on incremental rebuilds)
+    try:
+        if alias_abs_path.read_bytes().decode("utf-8") == content:
+            print(f"  -> Alias file up to date: {alias_page_path_str}")
+            return
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    alias_abs_path.parent.mkdir(parents=True, exist_ok=True)
     alias_abs_path.write_text(content, encoding="utf-8")
     print(f"  -> Generated alias file: {alias_page_path_str}")
 
+@dataclass(frozen=True)
+class PageMeta:
+    """
+    Per-page data derived once and shared by every visit of the page.
+    Aggregator/include/section data is looked up lazily (through the memoized
+    helpers) so that pages process_page skips are never scanned for includes,
+    and include warnings are printed at the same point of the walk as before.
+    """
+    __slots__ = ("path", "xref_str", "title", "anchor")
+    path: Path
+    xref_str: str
+    title: str
+    anchor: str
+
+    @property
+    def is_agg(self) -> bool:
+        return is_aggregator_page(self.path)
+
+    @property
+    def includes(self) -> Tuple[Path, ...]:
+        """Child pages to descend into; only populated for aggregator pages."""
+        return extract_include_files(self.path) if self.is_agg else ()
+
+    @property
+    def sections(self) -> Sections:
+        return extract_section_headings(self.path)
+
+@functools.lru_cache(maxsize=None)
+def load_page_meta(file_path: Path) -> Optional[PageMeta]:
+    """Returns the PageMeta for a page, or None if it lies outside PAGES_DIR."""
+    try:
+        xref_path = file_path.relative_to(PAGES_DIR)
+    except ValueError:
+        print(f"Warning: File outside pages dir: {file_path}")
+        return None
+
+    title, anchor = get_title_and_anchor(file_path, prefer_doc_title=False)
+    return PageMeta(path=file_path, xref_str=str(xref_path), title=title, anchor=anchor)
+
 # -------------- Navigation generation --------------
 
+# List markers for nav levels 1..MAX_NAV_DEPTH
+_INDENTS = ["*" * i for i in range(1, MAX_NAV_DEPTH + 1)]
+
 def add_entry(nav_lines: List[str], level: int, xref_target: str, title: str, anchor: str = ""):
-    indent = "*" * max(1, min(level, MAX_NAV_DEPTH))
+    indent = _INDENTS[max(0, min(level, MAX_NAV_DEPTH) - 1)]
     if anchor:
         nav_lines.append(f"{indent} xref:{xref_target}#{anchor}[{title}]")
     else:
@@ -264,22 +402,20 @@ def process_page(
     file_path: Path,
     master_key: str,
     current_level: int,
-    nav_lines: List[str],
-    visited: set
-):
+    nav_lines: List[str]
+) -> Tuple[Path, ...]:
     """
     Add a page and (limited) substructure to nav.
     - Adds the page itself (first heading >= '== '), using alias if configured.
     - Adds in-page headings (=== only by default), excluding the page's own first heading.
     - If the page is an aggregator and an alias is applied, show its children as sections on the alias page.
+    Returns the child pages to descend into (the includes of an unaliased aggregator).
     """
-    try:
-        xref_path = file_path.relative_to(PAGES_DIR)
-    except ValueError:
-        print(f"Warning: File outside pages dir: {file_path}")
-        return
+    meta = load_page_meta(file_path)
+    if meta is None:
+        return ()
 
-    xref_path_str = str(xref_path)
+    xref_path_str = meta.xref_str
 
     # Apply alias if this page is shared under this master
     final_xref_path, alias_created = resolve_alias(master_key, xref_path_str)
@@ -288,23 +424,22 @@ def process_page(
         create_alias_file(alias_created, xref_path_str)
 
     # Page title and anchor
-    title, anchor = get_title_and_anchor(file_path, prefer_doc_title=False)
+    title, anchor = meta.title, meta.anchor
     if not title or title.lower() == "untitled":
         print(f"Warning: Skipping file with problematic title '{title}': {file_path}")
         debug_head(file_path, 15)
-        return
+        return ()
 
     # Add the page entry
     add_entry(nav_lines, current_level, final_xref_path, title, anchor)
 
     # Aggregator handling: if alias is applied, render chapter links against the alias page
-    if is_aggregator_page(file_path) and alias_applied:
+    if meta.is_agg and alias_applied:
         process_aggregator_children_as_alias_sections(file_path, final_xref_path, current_level, nav_lines)
-        return  # Do not recurse into real chapter files under an alias context
+        return ()  # Do not recurse into real chapter files under an alias context
 
     # In-page sections (only === headings by default), skip duplicate of the page's main heading
-    sections = extract_section_headings(file_path)
-    for level, sub_anchor, sub_title in sections:
+    for level, sub_anchor, sub_title in zip(*meta.sections):
         if (sub_anchor == anchor) or (sub_title.strip().lower() == title.strip().lower()):
             continue  # avoid "Introduction -> Introduction" duplicates
         sub_nav_level = current_level + (level - 2)  # '===' => +1
@@ -312,13 +447,31 @@ def process_page(
             add_entry(nav_lines, sub_nav_level, final_xref_path, sub_title, sub_anchor)
 
     # If it's an aggregator but no alias is applied, drill into its includes one level (chapters)
-    if is_aggregator_page(file_path):
-        for inc in extract_include_files(file_path):
-            key = (str(inc), master_key)
-            if key in visited:
-                continue
-            visited.add(key)
-            process_page(inc, master_key, min(current_level + 1, MAX_NAV_DEPTH), nav_lines, visited)
+    return meta.includes if meta.is_agg else ()
+
+def process_pages(
+    pages: Tuple[Path, ...],
+    master_key: str,
+    master_idx: int,
+    current_level: int,
+    nav_lines: List[str],
+    visited: Set[Tuple[Path, int]]
+):
+    """
+    Depth-first walk over pages and the children process_page returns, using an
+    explicit stack. Pages are marked visited when popped, which matches the
+    order a recursive walk would visit them in.
+    """
+    stack: List[Tuple[Path, int]] = [(p, current_level) for p in reversed(pages)]
+    while stack:
+        file_path, level = stack.pop()
+        key = (file_path, master_idx)
+        if key in visited:
+            continue
+        visited.add(key)
+        children = process_page(file_path, master_key, level, nav_lines)
+        child_level = min(level + 1, MAX_NAV_DEPTH)
+        stack.extend((inc, child_level) for inc in reversed(children))
 
 def main():
     print("=== Generating navigation from AsciiDoc source ===")
@@ -328,9 +481,10 @@ def main():
         "",
     ]
     nav_lines: List[str] = []
-    visited: set = set()
+    # Keyed by (page path, index into MASTER_FILES)
+    visited: Set[Tuple[Path, int]] = set()
 
-    for master_file_rel_path in MASTER_FILES:
+    for master_idx, master_file_rel_path in enumerate(MASTER_FILES):
         master_path = PAGES_DIR / master_file_rel_path
 
         if not master_path.exists():
@@ -350,19 +504,16 @@ def main():
         # Under each master, process includes directly
         includes = extract_include_files(master_path)
         master_key = str(master_path.relative_to(PAGES_DIR))
-        for inc in includes:
-            key = (str(inc), master_key)
-            if key in visited:
-                continue
-            visited.add(key)
-            process_page(inc, master_key, current_level=2, nav_lines=nav_lines, visited=visited)
+        process_pages(includes, master_key, master_idx, current_level=2, nav_lines=nav_lines, visited=visited)
 
         # separator
         if master_file_rel_path != MASTER_FILES[-1]:
             nav_lines.append("")
 
-    final_content = "\n".join(header + nav_lines) + "\n"
-    DEST_NAV_FILE.write_text(final_content, encoding="utf-8")
+    # Stream lines out rather than joining the whole nav into one string first
+    with open(DEST_NAV_FILE, "w", encoding="utf-8", buffering=1 << 16) as f:
+        f.writelines(line + "\n" for line in header)
+        f.writelines(line + "\n" for line in nav_lines)
 
     # Summary
     print(f"Successfully generated navigation: {DEST_NAV_FILE}")